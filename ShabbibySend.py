@@ -8,8 +8,13 @@ import socket
 import threading
 import time
 import os
+import sys
 import queue
 import json
+import zlib
+import hashlib
+import bisect
+import struct
 from datetime import datetime
 from tkinter import (
     Tk, Toplevel, Frame, Label, Button, Listbox, Text, Scrollbar, filedialog,
@@ -18,14 +23,41 @@ from tkinter import (
 from tkinter.font import Font
 import tkinter as tk
 
+_STARTUP_T0 = time.perf_counter()
+
 # ---------- Configuration réseau ----------
 DISCOVERY_PORT = 6020
 TRANSFER_PORT = 5001
+SHARE_PORT = 5002  # Serveur de catalogue et de segments (téléchargement multi-sources)
 PEERS = set()
+PEER_LAST_SEEN = {}  # ip -> dernière annonce de présence reçue
+PEER_TTL = 10  # Délai (s) sans annonce avant de retirer un pair de la liste
 BUFFER_SIZE = 8192  # Augmenté pour de meilleures performances
 DISCOVERY_MSG = b'PRESENCE_XENDER'
+CATALOG_MSG = b'CATALOG_XENDER '  # Suivi d'un JSON {share_port, nonce, rev, files}
+CATALOG_TTL = 10  # Délai (s) sans annonce avant d'oublier le catalogue d'un pair
 gui_queue = queue.Queue()
 
+# ---------- Configuration locale ----------
+CONFIG_DIR = os.path.join(os.path.expanduser('~'), '.shabbibysend')
+HASH_CHUNK = 1024 * 1024  # Taille de lecture pour le calcul des empreintes
+PART_SUFFIX = '.shabbiby-part'
+STARTUP_BUDGET_MS = 1500  # Budget du temps jusqu'à l'interactivité (--startup-check)
+
+# ---------- Réglage automatique des transferts ----------
+CHUNK_CANDIDATES = [16 * 1024, 64 * 1024, 256 * 1024, 1024 * 1024]
+MIN_SOCKET_BUFFER = 64 * 1024
+MAX_SOCKET_BUFFER = 8 * 1024 * 1024
+TUNE_MIN_SIZE = 8 * 1024 * 1024     # En dessous, on réutilise le réglage mémorisé
+PROBE_FRACTION = 0.2                # Part du fichier consacrée à la mesure
+PROBE_MAX_BYTES = 64 * 1024 * 1024
+PROBE_MIN_SLICE_S = 0.2             # Durée minimale d'une tranche de mesure
+
+# ---------- Téléchargement multi-sources ----------
+RANGE_SIZE = 4 * 1024 * 1024  # Taille d'un segment vérifié individuellement
+STALL_TIMEOUT = 10            # Délai (s) au-delà duquel une source est considérée bloquée
+MAX_SOURCE_FAILURES = 3       # Échecs avant d'abandonner une source
+
 # ---------- Configuration des thèmes ----------
 THEMES = {
     'light': {
@@ -63,18 +95,35 @@ transfer_history = []
 transfer_queue = []
 stats = {'sent': 0, 'received': 0, 'files_sent': 0, 'files_received': 0}
 current_theme = 'light'
+SHARED_FILES = {}   # empreinte -> fichier partagé localement
+PEER_CATALOGS = {}  # ip -> catalogue annoncé par le pair
+CATALOG_NONCE = os.urandom(8).hex()  # Distingue les redémarrages : rev repart de 0 à chaque lancement
+catalog_rev = 0
+_catalog_lock = threading.Lock()
+
+_local_ip = None
 
 # ---------- Fonctions réseau ----------
-def my_ip():
+def my_ip(refresh=False):
+    """Retourne l'IP locale (mise en cache après la première résolution)"""
+    global _local_ip
+    if _local_ip is not None and not refresh:
+        return _local_ip
     s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
     try:
         s.connect(('8.8.8.8', 80))
         ip = s.getsockname()[0]
-        s.close()
     except:
         ip = '127.0.0.1'
+    finally:
+        s.close()
+    _local_ip = ip
     return ip
 
+def resolve_local_ip():
+    """Résout l'IP locale hors du thread de l'interface"""
+    gui_queue.put(("local_ip", my_ip(refresh=True)))
+
 def format_size(bytes_size):
     """Formate la taille en octets en format lisible"""
     for unit in ['B', 'KB', 'MB', 'GB']:
@@ -87,61 +136,493 @@ def format_speed(bytes_per_sec):
     """Formate la vitesse de transfert"""
     return f"{format_size(bytes_per_sec)}/s"
 
-def discover_peers():
+def recv_exact(conn, size):
+    """Reçoit exactement `size` octets ou lève ConnectionError"""
+    chunks = []
+    remaining = size
+    while remaining > 0:
+        data = conn.recv(min(remaining, HASH_CHUNK))
+        if not data:
+            raise ConnectionError("Connexion interrompue par le pair")
+        chunks.append(data)
+        remaining -= len(data)
+    return b''.join(chunks)
+
+def send_json(sock, obj):
+    """Envoie un message JSON préfixé par sa taille (4 octets)"""
+    payload = json.dumps(obj, separators=(',', ':')).encode('utf-8')
+    sock.sendall(len(payload).to_bytes(4, byteorder='big') + payload)
+
+def recv_json(conn):
+    """Reçoit un message JSON préfixé par sa taille (4 octets)"""
+    size = int.from_bytes(recv_exact(conn, 4), byteorder='big')
+    return json.loads(recv_exact(conn, size).decode('utf-8'))
+
+def new_hasher():
+    """Empreinte de contenu utilisée pour les index et les catalogues"""
+    return hashlib.blake2b(digest_size=16)
+
+def hash_file(path):
+    """Calcule l'empreinte du contenu d'un fichier"""
+    h = new_hasher()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_CHUNK), b''):
+            h.update(block)
+    return h.hexdigest()
+
+def safe_join(base, rel):
+    """Joint un chemin relatif reçu du réseau en refusant toute sortie de `base`"""
+    # Les chemins du manifeste utilisent « / » ; « \\ » et « : » sont des noms légaux
+    # sous POSIX mais des séparateurs (ou un lecteur) sous Windows
+    parts = [p for p in rel.split('/') if p not in ('', '.')]
+    if not parts or '..' in parts or rel.startswith('/'):
+        raise ValueError(f"Chemin refusé: {rel}")
+    if os.name == 'nt' and any('\\' in p or ':' in p for p in parts):
+        raise ValueError(f"Nom de fichier impossible sous Windows: {rel}")
+    base = os.path.realpath(base)
+    result = os.path.join(base, *parts)
+    if os.path.commonpath([base, os.path.realpath(result)]) != base:
+        raise ValueError(f"Chemin refusé: {rel}")
+    return result
+
+# ---------- Profil de démarrage ----------
+class StartupProfiler:
+    """Chronomètre les étapes du démarrage jusqu'à ce que la fenêtre soit interactive"""
+
+    def __init__(self, t0=None):
+        self.t0 = t0 if t0 is not None else time.perf_counter()
+        self.marks = []
+
+    def mark(self, label):
+        self.marks.append((label, time.perf_counter()))
+
+    def total_ms(self):
+        return ((self.marks[-1][1] if self.marks else self.t0) - self.t0) * 1000
+
+    def report(self):
+        parts = []
+        previous = self.t0
+        for label, t in self.marks:
+            parts.append(f"{label} {(t - previous) * 1000:.0f} ms")
+            previous = t
+        return f"Démarrage interactif en {self.total_ms():.0f} ms ({', '.join(parts)})"
+
+# ---------- Index de manifeste (mode miroir) ----------
+class ManifestIndex:
+    """Index persistant d'une arborescence : chemin relatif -> [taille, mtime_ns, empreinte].
+
+    L'index est stocké dans CONFIG_DIR et mis à jour de façon incrémentale :
+    seuls les fichiers dont la taille ou la date de modification a changé
+    sont ré-empreintés.
+    """
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        key = hashlib.sha1(self.root.encode('utf-8')).hexdigest()[:16]
+        self.path = os.path.join(CONFIG_DIR, 'index', f"{key}.json")
+        self.entries = {}
+        self.exists = False
+        self._digest = None
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('root') == self.root:
+            self.entries = data.get('entries', {})
+            self._digest = data.get('digest')
+            self.exists = True
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'root': self.root, 'digest': self.digest(), 'entries': self.entries},
+                      f, separators=(',', ':'))
+        os.replace(tmp, self.path)
+        self.exists = True
+
+    def refresh(self):
+        """Parcourt l'arborescence (stat uniquement) et retourne le nombre de fichiers ré-empreintés"""
+        seen = {}
+        rehashed = 0
+        stack = [(self.root, '')]
+        while stack:
+            current, prefix = stack.pop()
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        rel = prefix + entry.name
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append((entry.path, rel + '/'))
+                        elif entry.is_file(follow_symlinks=False) and not entry.name.endswith(PART_SUFFIX):
+                            st = entry.stat(follow_symlinks=False)
+                            old = self.entries.get(rel)
+                            if old and old[0] == st.st_size and old[1] == st.st_mtime_ns:
+                                seen[rel] = old
+                            else:
+                                seen[rel] = [st.st_size, st.st_mtime_ns, hash_file(entry.path)]
+                                rehashed += 1
+            except OSError:
+                continue
+        if rehashed or len(seen) != len(self.entries):
+            self._digest = None
+        self.entries = seen
+        return rehashed
+
+    def set_entry(self, rel, size, mtime_ns, digest):
+        self.entries[rel] = [size, mtime_ns, digest]
+        self._digest = None
+
+    def remove_entry(self, rel):
+        if self.entries.pop(rel, None) is not None:
+            self._digest = None
+
+    def digest(self):
+        """Empreinte globale de l'index (chemins, tailles et contenus)"""
+        if self._digest is None:
+            h = new_hasher()
+            for rel in sorted(self.entries):
+                size, _, content = self.entries[rel]
+                h.update(f"{rel}\0{size}\0{content}\n".encode('utf-8'))
+            self._digest = h.hexdigest()
+        return self._digest
+
+    def summary(self):
+        """Forme compacte envoyée au pair : chemin -> [taille, empreinte]"""
+        return {rel: [e[0], e[2]] for rel, e in self.entries.items()}
+
+def diff_manifests(local, remote, delete=False):
+    """Compare un index local et le résumé distant, retourne (à envoyer, à supprimer)"""
+    to_send = []
+    for rel, (size, mtime_ns, content) in local.items():
+        other = remote.get(rel)
+        if other is None or other[0] != size or other[1] != content:
+            to_send.append([rel, size, mtime_ns, content])
+    to_delete = [rel for rel in remote if rel not in local] if delete else []
+    return to_send, to_delete
+
+# ---------- Réglage automatique des transferts ----------
+_tuning_lock = threading.Lock()
+_tuning_profiles = None
+
+def _load_tuning_profiles():
+    global _tuning_profiles
+    if _tuning_profiles is None:
+        try:
+            with open(os.path.join(CONFIG_DIR, 'tuning.json'), 'r', encoding='utf-8') as f:
+                _tuning_profiles = json.load(f)
+        except (OSError, ValueError):
+            _tuning_profiles = {}
+    return _tuning_profiles
+
+def get_tuning_profile(peer):
+    """Retourne le meilleur réglage mémorisé pour un pair (ou None)"""
+    with _tuning_lock:
+        return _load_tuning_profiles().get(peer)
+
+def save_tuning_profile(peer, profile):
+    with _tuning_lock:
+        profiles = _load_tuning_profiles()
+        profiles[peer] = profile
+        os.makedirs(CONFIG_DIR, exist_ok=True)
+        path = os.path.join(CONFIG_DIR, 'tuning.json')
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(profiles, f, indent=1)
+        os.replace(path + '.tmp', path)
+
+def describe_tuning(tuning):
+    """Résumé lisible d'un réglage de transfert"""
+    parts = [f"bloc {format_size(tuning['chunk'])}"]
+    if tuning.get('socket_buffer'):
+        parts.append(f"tampon {format_size(tuning['socket_buffer'])}")
+    if tuning.get('rtt_ms') is not None:
+        parts.append(f"RTT {tuning['rtt_ms']:.1f} ms")
+    return f"{' · '.join(parts)} ({tuning['source']})"
+
+def tcp_info(sock):
+    """Retourne (octets acquittés, RTT lissé en s) lus dans TCP_INFO, ou None si indisponible"""
+    if not hasattr(socket, 'TCP_INFO'):
+        return None
+    try:
+        raw = sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_INFO, 256)
+    except OSError:
+        return None
+    if len(raw) < 128:
+        return None
+    # struct tcp_info (Linux) : tcpi_rtt (µs) à l'offset 68, tcpi_bytes_acked à l'offset 120
+    return struct.unpack_from('Q', raw, 120)[0], struct.unpack_from('I', raw, 68)[0] / 1e6
+
+def send_buffer_limits():
+    """Retourne (net.core.wmem_max, maximum de l'autoréglage tcp_wmem), ou None hors Linux"""
+    try:
+        with open('/proc/sys/net/core/wmem_max') as f:
+            wmem_max = int(f.read())
+        with open('/proc/sys/net/ipv4/tcp_wmem') as f:
+            autotune_max = int(f.read().split()[2])
+    except (OSError, ValueError, IndexError):
+        return None
+    return wmem_max, autotune_max
+
+class TransferTuner:
+    """Ajuste la taille de bloc et le tampon socket d'un envoi.
+
+    Pendant le début du transfert, chaque taille de CHUNK_CANDIDATES est essayée
+    sur une tranche du fichier. Le débit de chaque tranche est celui des octets
+    acquittés par le pair (TCP_INFO), pas celui du remplissage des tampons
+    locaux ; sans TCP_INFO, aucune mesure n'est faite. La mesure ne commence
+    qu'une fois l'émetteur bloqué par les acquittements (tampon d'émission
+    rempli), et elle est abandonnée si cela n'arrive pas dans le budget de
+    mesure. La taille la plus rapide est conservée. Fixer SO_SNDBUF désactive
+    l'autoréglage du noyau : le tampon n'est donc fixé que si le produit
+    débit × RTT dépasse ce que l'autoréglage peut atteindre, sans excéder
+    net.core.wmem_max. Le réglage n'est mémorisé que si le lien est resté
+    saturé pendant toute la mesure.
+    """
+
+    def __init__(self, peer, filesize, rtt=None):
+        self.peer = peer
+        self.rtt = rtt
+        self.sock = None
+        self.throughput = None
+        self.results = {}
+        self.candidates = []
+        self.sent = 0
+        self.acked_base = 0
+        self.saturated = True
+        self.warming_up = True
+        self.next_check = 0
+
+        profile = get_tuning_profile(peer) or {}
+        self.chunk = profile.get('chunk', BUFFER_SIZE)
+        self.socket_buffer = None
+        self.remembered_buffer = profile.get('socket_buffer')
+        self.source = 'mémorisé' if profile else 'défaut'
+
+        if filesize >= TUNE_MIN_SIZE:
+            self.probe_bytes = min(int(filesize * PROBE_FRACTION), PROBE_MAX_BYTES)
+            self.slice_bytes = self.probe_bytes // len(CHUNK_CANDIDATES)
+            self.candidates = list(CHUNK_CANDIDATES)
+
+    @property
+    def probing(self):
+        return bool(self.candidates)
+
+    def apply(self, sock):
+        """Applique le réglage initial à la socket et démarre la mesure si nécessaire"""
+        self.sock = sock
+        if self.remembered_buffer:
+            self._grow_buffer(self.remembered_buffer)
+        if self.probing:
+            info = tcp_info(sock)
+            if info is None:
+                self.candidates = []
+            else:
+                self.acked_base = info[0]
+
+    def receiver_hints(self):
+        """Paramètres transmis au récepteur dans les métadonnées"""
+        return {'chunk_size': max(CHUNK_CANDIDATES) if self.probing else self.chunk}
+
+    def chunk_size(self):
+        return self.chunk
+
+    def record(self, nbytes):
+        """Comptabilise un bloc envoyé ; retourne True quand le réglage vient d'être choisi"""
+        if not self.probing:
+            return False
+        self.sent += nbytes
+        if self.warming_up:
+            if self.sent < self.next_check:
+                return False
+            self.next_check = self.sent + MIN_SOCKET_BUFFER
+            info = self._blocked_info()
+            if info is None:
+                if self.sent > self.probe_bytes:
+                    # Le lien n'a jamais été saturé : pas de mesure fiable
+                    self.candidates = []
+                return False
+            self.warming_up = False
+            self._start_slice(info[0])
+            return False
+        self.slice_sent += nbytes
+        if self.slice_sent < self.slice_bytes:
+            return False
+        if time.perf_counter() - self.slice_start < PROBE_MIN_SLICE_S:
+            return False
+        info = tcp_info(self.sock)
+        if info is None:
+            self.candidates = []
+            self.results = {}
+            return False
+        acked, self.rtt = info
+        elapsed = max(time.perf_counter() - self.slice_start, 1e-6)
+        self.results[self.chunk] = (acked - self.slice_acked) / elapsed
+        if self._blocked_info() is None:
+            self.saturated = False
+        self.candidates.pop(0)
+        if self.candidates:
+            self._start_slice(acked)
+            return False
+        self._conclude()
+        return True
+
+    def details(self):
+        return {'chunk': self.chunk, 'socket_buffer': self.socket_buffer,
+                'rtt_ms': self.rtt * 1000 if self.rtt is not None else None,
+                'source': self.source}
+
+    def finish(self):
+        """Mémorise le réglage mesuré pour les prochains transferts vers ce pair"""
+        if self.results and not self.probing and self.saturated:
+            save_tuning_profile(self.peer, {
+                'chunk': self.chunk,
+                'socket_buffer': self.socket_buffer,
+                'rtt_ms': self.rtt * 1000 if self.rtt is not None else None,
+                'throughput': self.throughput,
+                'updated': datetime.now().isoformat(timespec='seconds')
+            })
+
+    def _blocked_info(self):
+        """TCP_INFO si l'émetteur attend les acquittements (tampon d'émission bien rempli)"""
+        info = tcp_info(self.sock)
+        if info is None:
+            return None
+        try:
+            threshold = max(MIN_SOCKET_BUFFER, self.sock.getsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF) // 4)
+        except OSError:
+            return None
+        return info if self.sent - (info[0] - self.acked_base) >= threshold else None
+
+    def _start_slice(self, acked):
+        self.chunk = self.candidates[0]
+        self.slice_sent = 0
+        self.slice_acked = acked
+        self.slice_start = time.perf_counter()
+
+    def _conclude(self):
+        self.chunk = max(self.results, key=self.results.get)
+        # Le débit retenu pour le tampon est la médiane des tranches, moins sensible au bruit
+        rates = sorted(self.results.values())
+        self.throughput = (rates[(len(rates) - 1) // 2] + rates[len(rates) // 2]) / 2
+        self.source = 'mesuré' if self.saturated else 'mesuré, lien non saturé'
+        if self.rtt:
+            bdp = int(self.throughput * self.rtt * 2)
+            self._grow_buffer(min(max(bdp, MIN_SOCKET_BUFFER), MAX_SOCKET_BUFFER))
+
+    def _grow_buffer(self, size):
+        """Agrandit SO_SNDBUF seulement là où l'autoréglage du noyau ne suffit pas"""
+        limits = send_buffer_limits()
+        if limits is not None:
+            wmem_max, autotune_max = limits
+            # Au-delà de wmem_max la valeur serait tronquée, puis figée
+            if size <= autotune_max or size > wmem_max:
+                return
+        try:
+            if size > self.sock.getsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF):
+                self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, size)
+                # Valeur réellement appliquée (Linux la double pour ses propres structures)
+                self.socket_buffer = self.sock.getsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF)
+        except OSError:
+            pass
+
+def discover_peers(port=DISCOVERY_PORT):
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
     sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
     try:
-        sock.bind(('', DISCOVERY_PORT))
+        sock.bind(('', port))
     except Exception as e:
-        gui_queue.put(("log", f"[DISCOVER] Impossible de binder le port {DISCOVERY_PORT}: {e}", "error"))
+        gui_queue.put(("log", f"[DISCOVER] Impossible de binder le port {port}: {e}", "error"))
         return
-    gui_queue.put(("log", f"[DISCOVER] Écoute UDP sur {DISCOVERY_PORT}", "info"))
+    gui_queue.put(("log", f"[DISCOVER] Écoute UDP sur {port}", "info"))
+    sock.settimeout(2)
     while True:
+        expire_peers()
+        expire_catalogs()
         try:
             data, addr = sock.recvfrom(1024)
             if data == DISCOVERY_MSG:
                 ip = addr[0]
-                if ip != my_ip() and ip not in PEERS:
-                    PEERS.add(ip)
-                    gui_queue.put(("peer_add", ip))
-                    gui_queue.put(("log", f"✓ Appareil découvert: {ip}", "success"))
+                if ip != my_ip():
+                    PEER_LAST_SEEN[ip] = time.time()
+                    if ip not in PEERS:
+                        PEERS.add(ip)
+                        gui_queue.put(("peer_add", ip))
+                        gui_queue.put(("log", f"✓ Appareil découvert: {ip}", "success"))
+            elif data.startswith(CATALOG_MSG):
+                ip = addr[0]
+                if ip != my_ip():
+                    announce = json.loads(data[len(CATALOG_MSG):].decode('utf-8'))
+                    version = (announce.get('nonce'), announce['rev'])
+                    known = PEER_CATALOGS.get(ip)
+                    if known is None or known['version'] != version or known['port'] != announce['share_port']:
+                        PEER_CATALOGS[ip] = {'version': version, 'port': announce['share_port'],
+                                             'files': [], 'seen': time.time()}
+                        threading.Thread(target=fetch_catalog, args=(ip, announce['share_port']),
+                                         daemon=True).start()
+                    else:
+                        known['seen'] = time.time()
         except:
             continue
 
-def announce_presence():
+def expire_peers():
+    """Retire les pairs qui n'annoncent plus leur présence"""
+    limit = time.time() - PEER_TTL
+    for ip in list(PEERS):
+        if PEER_LAST_SEEN.get(ip, 0) < limit:
+            PEERS.discard(ip)
+            PEER_LAST_SEEN.pop(ip, None)
+            gui_queue.put(("peer_remove", ip))
+            gui_queue.put(("log", f"Appareil disparu: {ip}", "warning"))
+
+def announce_presence(address=('<broadcast>', DISCOVERY_PORT)):
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
     sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
     gui_queue.put(("log", "[ANNOUNCE] Diffusion de présence activée", "info"))
     while True:
         try:
-            sock.sendto(DISCOVERY_MSG, ('<broadcast>', DISCOVERY_PORT))
+            sock.sendto(DISCOVERY_MSG, address)
+            if SHARED_FILES:
+                # Annonce séparée pour rester compatible avec les anciennes versions
+                announce = {'share_port': SHARE_PORT, 'nonce': CATALOG_NONCE,
+                            'rev': catalog_rev, 'files': len(SHARED_FILES)}
+                sock.sendto(CATALOG_MSG + json.dumps(announce).encode('utf-8'), address)
             time.sleep(2)
         except:
             time.sleep(2)
             continue
 
-def start_receiver(nonblocking=True):
+def start_receiver(nonblocking=True, port=TRANSFER_PORT):
     def _receive():
         s = socket.socket()
         s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         try:
-            s.bind(('', TRANSFER_PORT))
+            s.bind(('', port))
             s.listen(1)
         except Exception as e:
-            gui_queue.put(("log", f"[RECV] Impossible d'écouter {TRANSFER_PORT}: {e}", "error"))
+            gui_queue.put(("log", f"[RECV] Impossible d'écouter {port}: {e}", "error"))
             return
-        gui_queue.put(("log", f"[RECV] En attente de connexion sur {TRANSFER_PORT}...", "info"))
+        gui_queue.put(("log", f"[RECV] En attente de connexion sur {port}...", "info"))
         try:
             conn, addr = s.accept()
             gui_queue.put(("log", f"[RECV] Connexion établie avec {addr[0]}", "info"))
 
             # Recevoir les métadonnées du fichier (JSON)
-            metadata_size = int.from_bytes(conn.recv(4), byteorder='big')
-            metadata_json = conn.recv(metadata_size).decode('utf-8')
-            metadata = json.loads(metadata_json)
+            metadata = recv_json(conn)
+
+            if metadata.get('mode') == 'mirror':
+                receive_mirror(conn, addr[0], metadata)
+                conn.close()
+                s.close()
+                return
 
             filename = metadata.get('filename', f"recu_{int(time.time())}")
             filesize = metadata.get('filesize', 0)
+            # Le tampon de réception reste auto-ajusté par le noyau ; seule la taille de lecture suit l'émetteur
+            chunk = min(max(int(metadata.get('chunk_size') or BUFFER_SIZE), BUFFER_SIZE), max(CHUNK_CANDIDATES))
 
             save_name = f"RECU_{filename}"
             total_received = 0
@@ -151,7 +632,7 @@ def start_receiver(nonblocking=True):
 
             with open(save_name, "wb") as f:
                 while total_received < filesize:
-                    data = conn.recv(BUFFER_SIZE)
+                    data = conn.recv(chunk)
                     if not data:
                         break
                     f.write(data)
@@ -192,7 +673,7 @@ def start_receiver(nonblocking=True):
     else:
         _receive()
 
-def send_file_to(ip, filepath):
+def send_file_to(ip, filepath, port=TRANSFER_PORT):
     def _send():
         if not os.path.isfile(filepath):
             gui_queue.put(("notify", "Fichier non trouvé"))
@@ -202,7 +683,9 @@ def send_file_to(ip, filepath):
         try:
             s = socket.socket()
             s.settimeout(15)
-            s.connect((ip, TRANSFER_PORT))
+            connect_start = time.perf_counter()
+            s.connect((ip, port))
+            rtt = time.perf_counter() - connect_start  # Durée de la poignée de main TCP
         except Exception as e:
             gui_queue.put(("notify", f"Échec connexion {ip}: {e}"))
             gui_queue.put(("log", f"✗ Échec connexion à {ip}: {e}", "error"))
@@ -212,8 +695,13 @@ def send_file_to(ip, filepath):
             filename = os.path.basename(filepath)
             filesize = os.path.getsize(filepath)
 
+            tuner = TransferTuner(ip, filesize, rtt)
+            tuner.apply(s)
+            if not tuner.probing:
+                gui_queue.put(("tuning", tuner.details()))
+
             # Envoyer les métadonnées
-            metadata = json.dumps({'filename': filename, 'filesize': filesize})
+            metadata = json.dumps({'filename': filename, 'filesize': filesize, **tuner.receiver_hints()})
             metadata_bytes = metadata.encode('utf-8')
             s.send(len(metadata_bytes).to_bytes(4, byteorder='big'))
             s.send(metadata_bytes)
@@ -225,16 +713,19 @@ def send_file_to(ip, filepath):
             gui_queue.put(("progress_send_start", (filename, filesize)))
 
             with open(filepath, "rb") as f:
-                data = f.read(BUFFER_SIZE)
+                data = f.read(tuner.chunk_size())
                 while data:
                     s.sendall(data)
                     sent += len(data)
+                    if tuner.record(len(data)):
+                        gui_queue.put(("tuning", tuner.details()))
                     elapsed = time.time() - start_time
                     speed = sent / elapsed if elapsed > 0 else 0
                     gui_queue.put(("progress_send", (sent, filesize, filename, speed)))
-                    data = f.read(BUFFER_SIZE)
+                    data = f.read(tuner.chunk_size())
 
             s.close()
+            tuner.finish()
 
             # Enregistrer dans l'historique
             transfer_history.append({
@@ -243,7 +734,8 @@ def send_file_to(ip, filepath):
                 'size': filesize,
                 'peer': ip,
                 'timestamp': datetime.now().strftime("%H:%M:%S"),
-                'status': 'completed'
+                'status': 'completed',
+                'tuning': tuner.details()
             })
 
             # Mettre à jour les statistiques
@@ -269,6 +761,589 @@ def send_multiple_files(ip, filepaths):
         send_file_to(ip, filepath)
         time.sleep(0.5)  # Petit délai entre les fichiers
 
+# ---------- Mode miroir (synchronisation de dossier) ----------
+def receive_mirror(conn, peer, metadata):
+    """Côté récepteur du mode miroir.
+
+    L'index persistant du dossier cible fait foi : il n'est reconstruit par un
+    parcours complet que lors du premier miroir vers ce dossier.
+    """
+    root_name = os.path.basename(metadata.get('root', '').replace('\\', '/').rstrip('/')) or 'miroir'
+    target = os.path.realpath(f"RECU_{root_name}")
+    os.makedirs(target, exist_ok=True)
+
+    index = ManifestIndex(target)
+    if not index.exists:
+        index.refresh()
+        index.save()
+
+    if metadata.get('digest') == index.digest():
+        send_json(conn, {'status': 'up_to_date'})
+        gui_queue.put(("log", f"✓ Miroir {root_name} déjà à jour ({len(index.entries)} fichiers)", "success"))
+        return
+
+    # Envoyer notre index compressé pour que l'expéditeur calcule la différence
+    blob = zlib.compress(json.dumps(index.summary(), separators=(',', ':')).encode('utf-8'), 1)
+    send_json(conn, {'status': 'index', 'size': len(blob)})
+    conn.sendall(blob)
+
+    plan = recv_json(conn)
+    files = plan.get('files', [])
+    total = sum(entry[1] for entry in files)
+    total_received = 0
+    deleted = 0
+    skipped = []
+    start_time = time.time()
+
+    gui_queue.put(("progress_receive_start", (root_name, total)))
+
+    try:
+        for rel, size, mtime_ns, content in files:
+            try:
+                path = safe_join(target, rel)
+            except ValueError as e:
+                # Consommer le contenu annoncé pour rester aligné sur le flux
+                skipped.append(rel)
+                gui_queue.put(("log", f"Miroir {root_name}: fichier ignoré ({e})", "warning"))
+                remaining = size
+                while remaining > 0:
+                    data = conn.recv(min(remaining, BUFFER_SIZE))
+                    if not data:
+                        raise ConnectionError("Connexion interrompue par le pair")
+                    remaining -= len(data)
+                    total_received += len(data)
+                continue
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = path + PART_SUFFIX
+            h = new_hasher()
+            remaining = size
+            with open(tmp, "wb") as f:
+                while remaining > 0:
+                    data = conn.recv(min(remaining, BUFFER_SIZE))
+                    if not data:
+                        raise ConnectionError("Connexion interrompue par le pair")
+                    f.write(data)
+                    h.update(data)
+                    remaining -= len(data)
+                    total_received += len(data)
+                    elapsed = time.time() - start_time
+                    speed = total_received / elapsed if elapsed > 0 else 0
+                    gui_queue.put(("progress_receive", (total_received, total, root_name, speed)))
+            if h.hexdigest() != content:
+                os.remove(tmp)
+                raise ValueError(f"Empreinte invalide pour {rel}")
+            os.replace(tmp, path)
+            os.utime(path, ns=(mtime_ns, mtime_ns))
+            st = os.stat(path)
+            index.set_entry(rel, st.st_size, st.st_mtime_ns, content)
+
+        for rel in plan.get('delete', []):
+            try:
+                path = safe_join(target, rel)
+            except ValueError:
+                continue
+            try:
+                os.remove(path)
+                deleted += 1
+            except FileNotFoundError:
+                pass
+            index.remove_entry(rel)
+            # Supprimer les dossiers devenus vides
+            parent = os.path.dirname(path)
+            while parent != target:
+                try:
+                    os.rmdir(parent)
+                except OSError:
+                    break
+                parent = os.path.dirname(parent)
+    finally:
+        index.save()
+
+    written = len(files) - len(skipped)
+    send_json(conn, {'status': 'done', 'written': written, 'deleted': deleted, 'skipped': skipped})
+
+    transfer_history.append({
+        'type': 'received',
+        'filename': f"{os.path.basename(target)}/ ({written} fichiers, {deleted} supprimés)",
+        'size': total,
+        'peer': peer,
+        'timestamp': datetime.now().strftime("%H:%M:%S"),
+        'status': 'completed'
+    })
+
+    stats['received'] += total
+    stats['files_received'] += written
+
+    ignored = f", {len(skipped)} ignoré(s)" if skipped else ""
+    gui_queue.put(("log", f"✓ Miroir {root_name} synchronisé: {written} fichier(s) reçu(s), "
+                          f"{deleted} supprimé(s){ignored} ({format_size(total)})", "success"))
+    gui_queue.put(("notify", f"Miroir synchronisé : {os.path.basename(target)}"))
+    gui_queue.put(("update_stats", None))
+    gui_queue.put(("update_history", None))
+
+def mirror_directory_to(ip, dirpath, delete=False, port=TRANSFER_PORT):
+    """Synchronise un dossier vers un pair en n'envoyant que les fichiers nouveaux ou modifiés"""
+    def _mirror():
+        if not os.path.isdir(dirpath):
+            gui_queue.put(("notify", "Dossier non trouvé"))
+            gui_queue.put(("log", f"✗ Dossier introuvable: {dirpath}", "error"))
+            return
+
+        root_name = os.path.basename(os.path.normpath(dirpath))
+        try:
+            scan_start = time.time()
+            index = ManifestIndex(dirpath)
+            rehashed = index.refresh()
+            index.save()
+        except Exception as e:
+            gui_queue.put(("log", f"✗ Erreur d'indexation de {dirpath}: {e}", "error"))
+            return
+        gui_queue.put(("log", f"[MIRROR] Index local: {len(index.entries)} fichiers, "
+                              f"{rehashed} ré-empreinté(s) en {time.time() - scan_start:.2f}s", "info"))
+
+        try:
+            s = socket.socket()
+            s.settimeout(15)
+            s.connect((ip, port))
+            # Le premier miroir peut obliger le récepteur à indexer son dossier
+            s.settimeout(120)
+        except Exception as e:
+            gui_queue.put(("notify", f"Échec connexion {ip}: {e}"))
+            gui_queue.put(("log", f"✗ Échec connexion à {ip}: {e}", "error"))
+            return
+
+        try:
+            send_json(s, {'mode': 'mirror', 'root': root_name, 'digest': index.digest(),
+                          'count': len(index.entries)})
+            reply = recv_json(s)
+            if reply.get('status') == 'up_to_date':
+                s.close()
+                gui_queue.put(("log", f"✓ Miroir {root_name} déjà à jour sur {ip}", "success"))
+                return
+
+            remote = json.loads(zlib.decompress(recv_exact(s, reply['size'])).decode('utf-8'))
+            to_send, to_delete = diff_manifests(index.entries, remote, delete)
+            send_json(s, {'files': to_send, 'delete': to_delete})
+
+            total = sum(entry[1] for entry in to_send)
+            sent = 0
+            start_time = time.time()
+
+            gui_queue.put(("progress_send_start", (root_name, total)))
+
+            for rel, size, _, _ in to_send:
+                with open(os.path.join(index.root, *rel.split('/')), "rb") as f:
+                    remaining = size
+                    while remaining > 0:
+                        data = f.read(min(remaining, BUFFER_SIZE))
+                        if not data:
+                            raise IOError(f"{rel} modifié pendant l'envoi")
+                        s.sendall(data)
+                        remaining -= len(data)
+                        sent += len(data)
+                        elapsed = time.time() - start_time
+                        speed = sent / elapsed if elapsed > 0 else 0
+                        gui_queue.put(("progress_send", (sent, total, root_name, speed)))
+
+            result = recv_json(s)
+            s.close()
+
+            transfer_history.append({
+                'type': 'sent',
+                'filename': f"{root_name}/ ({len(to_send)} fichiers, {len(to_delete)} supprimés)",
+                'size': total,
+                'peer': ip,
+                'timestamp': datetime.now().strftime("%H:%M:%S"),
+                'status': 'completed'
+            })
+
+            stats['sent'] += total
+            stats['files_sent'] += len(to_send)
+
+            gui_queue.put(("notify", f"Miroir synchronisé avec {ip}"))
+            gui_queue.put(("log", f"✓ Miroir {root_name} → {ip}: {result.get('written', 0)} fichier(s) envoyé(s), "
+                                  f"{result.get('deleted', 0)} supprimé(s) ({format_size(total)})", "success"))
+            for rel in result.get('skipped', []):
+                gui_queue.put(("log", f"Miroir {root_name}: {rel} refusé par {ip} (nom invalide sur le récepteur)",
+                               "warning"))
+            gui_queue.put(("update_stats", None))
+            gui_queue.put(("update_history", None))
+
+        except Exception as e:
+            gui_queue.put(("notify", f"Erreur miroir: {e}"))
+            gui_queue.put(("log", f"✗ Erreur lors du miroir: {e}", "error"))
+            try: s.close()
+            except: pass
+
+    threading.Thread(target=_mirror, daemon=True).start()
+
+# ---------- Partage et téléchargement multi-sources ----------
+def share_file(path):
+    """Ajoute un fichier au catalogue partagé (empreinte globale et par segment)"""
+    def _share():
+        global catalog_rev
+        try:
+            whole = new_hasher()
+            ranges = []
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(RANGE_SIZE), b''):
+                    whole.update(block)
+                    h = new_hasher()
+                    h.update(block)
+                    ranges.append(h.hexdigest())
+        except OSError as e:
+            gui_queue.put(("log", f"✗ Impossible de partager {path}: {e}", "error"))
+            return
+        file_hash = whole.hexdigest()
+        with _catalog_lock:
+            SHARED_FILES[file_hash] = {
+                'path': path,
+                'name': os.path.basename(path),
+                'size': os.path.getsize(path),
+                'ranges': ranges
+            }
+            catalog_rev += 1
+        gui_queue.put(("log", f"✓ Fichier partagé: {os.path.basename(path)} ({file_hash[:12]})", "success"))
+
+    threading.Thread(target=_share, daemon=True).start()
+
+def start_share_server(port=SHARE_PORT):
+    """Sert le catalogue, les manifestes et les segments des fichiers partagés"""
+    def _handle(conn):
+        try:
+            while True:
+                request = recv_json(conn)
+                if not isinstance(request, dict):
+                    send_json(conn, {'error': 'requête invalide'})
+                    continue
+                op = request.get('op')
+                file_hash = request.get('hash')
+                entry = SHARED_FILES.get(file_hash) if isinstance(file_hash, str) else None
+                if op == 'catalog':
+                    with _catalog_lock:
+                        files = [{'hash': h, 'name': e['name'], 'size': e['size']} for h, e in SHARED_FILES.items()]
+                        rev = catalog_rev
+                    send_json(conn, {'nonce': CATALOG_NONCE, 'rev': rev, 'files': files})
+                elif entry is None:
+                    send_json(conn, {'error': 'fichier inconnu'})
+                elif op == 'manifest':
+                    send_json(conn, {'size': entry['size'], 'range_size': RANGE_SIZE, 'ranges': entry['ranges']})
+                elif (op == 'range' and type(request.get('index')) is int
+                      and 0 <= request['index'] < len(entry['ranges'])):
+                    offset = request['index'] * RANGE_SIZE
+                    length = min(RANGE_SIZE, entry['size'] - offset)
+                    send_json(conn, {'length': length})
+                    with open(entry['path'], "rb") as f:
+                        conn.sendfile(f, offset, length)
+                else:
+                    send_json(conn, {'error': 'requête invalide'})
+        except (OSError, ValueError):
+            pass
+        finally:
+            conn.close()
+
+    def _serve():
+        s = socket.socket()
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            s.bind(('', port))
+            s.listen(16)
+        except Exception as e:
+            gui_queue.put(("log", f"[SHARE] Impossible d'écouter {port}: {e}", "error"))
+            return
+        while True:
+            try:
+                conn, _ = s.accept()
+            except OSError:
+                continue
+            threading.Thread(target=_handle, args=(conn,), daemon=True).start()
+
+    threading.Thread(target=_serve, daemon=True).start()
+
+def fetch_catalog(ip, port):
+    """Récupère le catalogue complet d'un pair après une annonce"""
+    try:
+        with socket.create_connection((ip, port), timeout=STALL_TIMEOUT) as s:
+            send_json(s, {'op': 'catalog'})
+            catalog = recv_json(s)
+        version = (catalog.get('nonce'), catalog['rev'])
+        files = [entry for entry in catalog['files']
+                 if isinstance(entry.get('hash'), str) and isinstance(entry.get('name'), str)
+                 and type(entry.get('size')) is int and entry['size'] >= 0]
+    except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+        PEER_CATALOGS.pop(ip, None)
+        gui_queue.put(("log", f"✗ Catalogue de {ip} indisponible: {e}", "error"))
+        return
+    PEER_CATALOGS[ip] = {'version': version, 'port': port, 'files': files, 'seen': time.time()}
+    gui_queue.put(("log", f"[SHARE] Catalogue de {ip}: {len(files)} fichier(s)", "info"))
+
+def expire_catalogs():
+    """Oublie les catalogues des pairs qui ne les annoncent plus"""
+    limit = time.time() - CATALOG_TTL
+    for ip, catalog in list(PEER_CATALOGS.items()):
+        if catalog['seen'] < limit:
+            PEER_CATALOGS.pop(ip, None)
+
+def swarm_sources():
+    """Regroupe les catalogues des pairs : empreinte -> (nom, taille, [(ip, port)])"""
+    expire_catalogs()
+    files = {}
+    for ip, catalog in list(PEER_CATALOGS.items()):
+        for entry in catalog['files']:
+            _, _, sources = files.setdefault(entry['hash'], (entry['name'], entry['size'], []))
+            sources.append((ip, catalog['port']))
+    return files
+
+class SwarmScheduler:
+    """Répartit les segments d'un fichier entre plusieurs sources.
+
+    Chaque source tire le segment suivant dès qu'elle a fini le précédent : les
+    sources rapides en reçoivent donc davantage. Quand il ne reste plus de
+    segment libre, une source inoccupée redemande un segment en cours chez une
+    source nettement plus lente ; la première copie vérifiée est conservée.
+    """
+
+    def __init__(self, file, manifest, name, total):
+        self.file = file
+        self.ranges = manifest['ranges']
+        self.range_size = manifest['range_size']
+        self.name = name
+        self.total = total
+        self.pending = list(range(len(self.ranges)))
+        self.inflight = {}  # segment -> (début, sources)
+        self.done = set()
+        self.received = 0
+        self.start_time = time.time()
+        self.cond = threading.Condition()
+
+    def finished(self):
+        return len(self.done) == len(self.ranges)
+
+    def next_range(self, source, average):
+        """Retourne le prochain segment à demander à `source`, ou None si tout est reçu"""
+        with self.cond:
+            while not self.finished():
+                if self.pending:
+                    index = self.pending.pop(0)
+                    self.inflight[index] = (time.time(), {source})
+                    return index
+                # Fin de téléchargement : doubler un segment qui traîne ailleurs
+                threshold = 2 * average if average else STALL_TIMEOUT / 2
+                now = time.time()
+                for index, (started, holders) in sorted(self.inflight.items(), key=lambda item: item[1][0]):
+                    if source not in holders and now - started > threshold:
+                        holders.add(source)
+                        return index
+                self.cond.wait(0.5)
+            return None
+
+    def complete(self, index, source, data):
+        """Écrit un segment vérifié à son offset ; retourne False s'il était déjà reçu"""
+        with self.cond:
+            if index in self.done:
+                return False
+            self.file.seek(index * self.range_size)
+            self.file.write(data)
+            self.done.add(index)
+            self.inflight.pop(index, None)
+            self.received += len(data)
+            self.cond.notify_all()
+        elapsed = time.time() - self.start_time
+        speed = self.received / elapsed if elapsed > 0 else 0
+        gui_queue.put(("progress_receive", (self.received, self.total, self.name, speed)))
+        return True
+
+    def fail(self, index, source):
+        """Remet un segment en tête de file après l'échec d'une source"""
+        with self.cond:
+            _, holders = self.inflight.get(index, (None, set()))
+            holders.discard(source)
+            if index not in self.done and not holders:
+                self.inflight.pop(index, None)
+                self.pending.insert(0, index)
+            self.cond.notify_all()
+
+def swarm_download(file_hash, name, size, sources):
+    """Télécharge un fichier par segments depuis plusieurs pairs en parallèle"""
+    def _fetch_from(scheduler, ip, port, report):
+        label = ip if port == SHARE_PORT else f"{ip}:{port}"
+        failures = 0
+        timings = []
+        conn = None
+        while failures < MAX_SOURCE_FAILURES:
+            average = sum(timings) / len(timings) if timings else None
+            index = scheduler.next_range((ip, port), average)
+            if index is None:
+                break
+            try:
+                if conn is None:
+                    conn = socket.create_connection((ip, port), timeout=STALL_TIMEOUT)
+                started = time.time()
+                send_json(conn, {'op': 'range', 'hash': file_hash, 'index': index})
+                header = recv_json(conn)
+                if not isinstance(header, dict):
+                    raise ValueError('réponse invalide')
+                if 'length' not in header:
+                    raise ValueError(header.get('error', 'réponse invalide'))
+                expected = min(scheduler.range_size, scheduler.total - index * scheduler.range_size)
+                if header['length'] != expected:
+                    raise ValueError(f"longueur annoncée {header['length']} au lieu de {expected}")
+                data = recv_exact(conn, expected)
+                h = new_hasher()
+                h.update(data)
+                if h.hexdigest() != scheduler.ranges[index]:
+                    raise ValueError(f"empreinte invalide pour le segment {index}")
+            except (OSError, ValueError) as e:
+                failures += 1
+                scheduler.fail(index, (ip, port))
+                gui_queue.put(("log", f"[SWARM] {label}: segment {index} à redemander ({e})", "warning"))
+                if conn is not None:
+                    conn.close()
+                    conn = None
+                continue
+            timings.append(time.time() - started)
+            if scheduler.complete(index, (ip, port), data):
+                report[label] = report.get(label, 0) + len(data)
+        if conn is not None:
+            conn.close()
+
+    def _download():
+        manifest = None
+        for ip, port in sources:
+            try:
+                with socket.create_connection((ip, port), timeout=STALL_TIMEOUT) as s:
+                    send_json(s, {'op': 'manifest', 'hash': file_hash})
+                    reply = recv_json(s)
+            except (OSError, ValueError) as e:
+                gui_queue.put(("log", f"[SWARM] Manifeste de {ip} indisponible: {e}", "warning"))
+                continue
+            # Segments de taille fixe : un pair ne peut pas imposer de lecture plus grande
+            if (isinstance(reply, dict) and reply.get('size') == size and reply.get('range_size') == RANGE_SIZE
+                    and isinstance(reply.get('ranges'), list) and len(reply['ranges']) == -(-size // RANGE_SIZE)):
+                manifest = reply
+                break
+            gui_queue.put(("log", f"[SWARM] Manifeste de {ip} refusé pour {name}", "warning"))
+        if manifest is None:
+            gui_queue.put(("log", f"✗ Aucun manifeste valide pour {name}", "error"))
+            return
+
+        save_name = f"RECU_{os.path.basename(name)}"
+        tmp = save_name + PART_SUFFIX
+        report = {}
+        gui_queue.put(("progress_receive_start", (save_name, size)))
+        gui_queue.put(("log", f"[SWARM] {name}: {len(manifest['ranges'])} segment(s) depuis "
+                              f"{len(sources)} source(s)", "info"))
+
+        try:
+            with open(tmp, "wb") as f:
+                f.truncate(size)
+                scheduler = SwarmScheduler(f, manifest, save_name, size)
+                workers = [threading.Thread(target=_fetch_from, args=(scheduler, ip, port, report), daemon=True)
+                           for ip, port in sources]
+                for worker in workers:
+                    worker.start()
+                # Ne pas attendre les sources encore bloquées une fois tous les segments reçus
+                with scheduler.cond:
+                    while not scheduler.finished() and any(worker.is_alive() for worker in workers):
+                        scheduler.cond.wait(0.5)
+            if not scheduler.finished():
+                raise IOError(f"{len(scheduler.ranges) - len(scheduler.done)} segment(s) sans source disponible")
+            if hash_file(tmp) != file_hash:
+                raise ValueError("empreinte finale invalide")
+            os.replace(tmp, save_name)
+        except Exception as e:
+            gui_queue.put(("log", f"✗ Erreur téléchargement {name}: {e}", "error"))
+            try: os.remove(tmp)
+            except OSError: pass
+            return
+
+        transfer_history.append({
+            'type': 'received',
+            'filename': save_name,
+            'size': size,
+            'peer': ', '.join(sorted(report)),
+            'timestamp': datetime.now().strftime("%H:%M:%S"),
+            'status': 'completed'
+        })
+
+        stats['received'] += size
+        stats['files_received'] += 1
+
+        detail = ', '.join(f"{ip}: {format_size(n)}" for ip, n in sorted(report.items(), key=lambda item: -item[1]))
+        gui_queue.put(("log", f"✓ Fichier reçu de {len(report)} source(s): {save_name} ({detail})", "success"))
+        gui_queue.put(("notify", f"Fichier reçu : {save_name}"))
+        gui_queue.put(("update_stats", None))
+        gui_queue.put(("update_history", None))
+
+    threading.Thread(target=_download, daemon=True).start()
+
+# ---------- Index des pairs ----------
+def peer_sort_key(ip):
+    """Clé de tri numérique des adresses IPv4 (les autres après, par ordre alphabétique)"""
+    try:
+        return (0, tuple(int(part) for part in ip.split('.')), ip)
+    except ValueError:
+        return (1, (), ip)
+
+class PeerIndex:
+    """Index trié des pairs découverts, avec une vue filtrée maintenue incrémentalement"""
+
+    def __init__(self):
+        self.records = {}  # ip -> enregistrement du pair
+        self.keys = []     # clés triées de tous les pairs
+        self.view = []     # clés triées des pairs correspondant au filtre
+        self.filter_text = ''
+
+    def __len__(self):
+        return len(self.records)
+
+    def matches(self, record):
+        if not self.filter_text:
+            return True
+        return self.filter_text in record['ip'] or self.filter_text in record.get('name', '').lower()
+
+    def add(self, record):
+        """Ajoute ou met à jour un pair, retourne sa position dans la vue (ou None)"""
+        ip = record['ip']
+        key = peer_sort_key(ip)
+        if ip in self.records:
+            self.records[ip].update(record)
+            return None
+        self.records[ip] = record
+        bisect.insort(self.keys, key)
+        if self.matches(record):
+            position = bisect.bisect_left(self.view, key)
+            self.view.insert(position, key)
+            return position
+        return None
+
+    def remove(self, ip):
+        """Retire un pair, retourne son ancienne position dans la vue (ou None)"""
+        if self.records.pop(ip, None) is None:
+            return None
+        key = peer_sort_key(ip)
+        del self.keys[bisect.bisect_left(self.keys, key)]
+        position = bisect.bisect_left(self.view, key)
+        if position < len(self.view) and self.view[position] == key:
+            del self.view[position]
+            return position
+        return None
+
+    def set_filter(self, text):
+        self.filter_text = text.strip().lower()
+        self.view = [key for key in self.keys if self.matches(self.records[key[2]])]
+
+    def visible(self, ip):
+        """Indique si le pair figure dans la vue filtrée"""
+        key = peer_sort_key(ip)
+        position = bisect.bisect_left(self.view, key)
+        return position < len(self.view) and self.view[position] == key
+
+    def record_at(self, position):
+        if 0 <= position < len(self.view):
+            return self.records[self.view[position][2]]
+        return None
+
 # ---------- Classes pour widgets personnalisés ----------
 class ModernButton(tk.Canvas):
     def __init__(self, parent, text, command=None, bg_color='#5b7fff', fg_color='#ffffff',
@@ -299,14 +1374,147 @@ class ModernButton(tk.Canvas):
     def on_leave(self, event):
         self.itemconfig(self.rect, fill=self.bg_color)
 
+class PeerListView(tk.Frame):
+    """Liste de pairs virtualisée : seules les lignes visibles sont dessinées"""
+
+    ROW_HEIGHT = 26
+
+    def __init__(self, parent, theme, rows=8, **kwargs):
+        super().__init__(parent, bg=theme['card_bg'], **kwargs)
+        self.theme = theme
+        self.index = PeerIndex()
+        self.selected_ip = None
+        self._render_pending = False
+
+        # Barre de recherche
+        search_frame = Frame(self, bg=theme['card_bg'])
+        search_frame.pack(fill='x', pady=(0, 5))
+
+        self.search_var = StringVar()
+        self.search_var.trace_add('write', lambda *_: self.on_search())
+        tk.Entry(search_frame, textvariable=self.search_var, bg=theme['bg'],
+                 fg=theme['text_primary'], insertbackground=theme['text_primary'],
+                 font=('Segoe UI', 10), bd=0, highlightthickness=1,
+                 highlightbackground=theme['border']).pack(side='left', fill='x', expand=True, ipady=4)
+
+        self.count_var = StringVar(value="0 appareil")
+        Label(search_frame, textvariable=self.count_var, bg=theme['card_bg'],
+              fg=theme['text_secondary'], font=('Segoe UI', 8)).pack(side='right', padx=(8, 0))
+
+        # Zone de rendu
+        list_frame = Frame(self, bg=theme['card_bg'])
+        list_frame.pack(fill='both', expand=True)
+
+        self.scrollbar = Scrollbar(list_frame, command=self.yview)
+        self.scrollbar.pack(side='right', fill='y')
+
+        self.canvas = Canvas(list_frame, bg=theme['bg'], bd=0, highlightthickness=0,
+                             height=rows * self.ROW_HEIGHT, yscrollcommand=self.scrollbar.set)
+        self.canvas.pack(side='left', fill='both', expand=True)
+
+        self.canvas.bind('<Configure>', lambda e: self.schedule_render())
+        self.canvas.bind('<Button-1>', self.on_click)
+        self.canvas.bind('<MouseWheel>', self.on_wheel)
+        self.canvas.bind('<Button-4>', lambda e: self.yview('scroll', -3, 'units'))
+        self.canvas.bind('<Button-5>', lambda e: self.yview('scroll', 3, 'units'))
+
+    def add_peer(self, record):
+        self.index.add(record)
+        self.schedule_render()
+        self.update_count()
+
+    def remove_peer(self, ip):
+        if ip == self.selected_ip:
+            self.selected_ip = None
+        if self.index.remove(ip) is not None:
+            self.schedule_render()
+        self.update_count()
+
+    def selected_peer(self):
+        """Retourne l'enregistrement du pair sélectionné s'il est affiché (ou None)"""
+        if self.selected_ip is None or not self.index.visible(self.selected_ip):
+            return None
+        return self.index.records.get(self.selected_ip)
+
+    def update_count(self):
+        total = len(self.index)
+        shown = len(self.index.view)
+        label = f"{total} appareil{'s' if total > 1 else ''}"
+        self.count_var.set(label if shown == total else f"{shown} / {label}")
+
+    def on_search(self):
+        self.index.set_filter(self.search_var.get())
+        if self.selected_ip is not None and not self.index.visible(self.selected_ip):
+            self.selected_ip = None  # Ne jamais agir sur un pair masqué par le filtre
+        self.canvas.yview_moveto(0)
+        self.update_count()
+        self.schedule_render()
+
+    def yview(self, *args):
+        self.canvas.yview(*args)
+        self.schedule_render()
+
+    def on_wheel(self, event):
+        self.yview('scroll', -1 if event.delta > 0 else 1, 'units')
+
+    def on_click(self, event):
+        position = int(self.canvas.canvasy(event.y) // self.ROW_HEIGHT)
+        record = self.index.record_at(position)
+        if record is not None:
+            self.selected_ip = record['ip']
+            self.schedule_render()
+
+    def schedule_render(self):
+        """Regroupe les rendus demandés pendant une rafale d'événements"""
+        if not self._render_pending:
+            self._render_pending = True
+            self.after_idle(self.render)
+
+    def render(self):
+        self._render_pending = False
+        width = self.canvas.winfo_width()
+        height = self.canvas.winfo_height()
+        total_height = len(self.index.view) * self.ROW_HEIGHT
+        self.canvas.configure(scrollregion=(0, 0, width, max(total_height, height)),
+                              yscrollincrement=self.ROW_HEIGHT)
+
+        top = self.canvas.canvasy(0)
+        first = max(0, int(top // self.ROW_HEIGHT))
+        last = min(len(self.index.view), int((top + height) // self.ROW_HEIGHT) + 1)
+
+        self.canvas.delete('row')
+        for position in range(first, last):
+            record = self.index.record_at(position)
+            y = position * self.ROW_HEIGHT
+            selected = record['ip'] == self.selected_ip
+            if selected:
+                self.canvas.create_rectangle(0, y, width, y + self.ROW_HEIGHT,
+                                             fill=self.theme['primary'], outline='', tags='row')
+            label = f"  🖥️  {record['ip']}"
+            if record.get('name'):
+                label += f"  ({record['name']})"
+            self.canvas.create_text(6, y + self.ROW_HEIGHT / 2, text=label, anchor='w',
+                                    fill='#ffffff' if selected else self.theme['text_primary'],
+                                    font=('Segoe UI', 10), tags='row')
+
 # ---------- GUI Principale ----------
 class ModernXenderGUI:
-    def __init__(self, root):
+    def __init__(self, root, profiler=None, network=True):
         self.root = root
+        self.startup = profiler or StartupProfiler()
         root.title("ShabbibySend - Transfert de fichiers P2P")
         root.geometry("1200x700")
         root.minsize(1000, 600)
 
+        # Démarrer les threads réseau en parallèle de la construction des widgets
+        if network:
+            threading.Thread(target=resolve_local_ip, daemon=True).start()
+            threading.Thread(target=discover_peers, args=(DISCOVERY_PORT,), daemon=True).start()
+            threading.Thread(target=announce_presence, args=(('<broadcast>', DISCOVERY_PORT),),
+                             daemon=True).start()
+            start_share_server(SHARE_PORT)
+            self.startup.mark("réseau")
+
         self.current_theme = 'light'
         self.theme = THEMES[self.current_theme]
         root.configure(bg=self.theme['bg'])
@@ -315,9 +1523,7 @@ class ModernXenderGUI:
         self.transfer_in_progress = False
         self.current_speed = StringVar(value="0 B/s")
         self.current_progress = StringVar(value="0%")
-
-        # Afficher le splash screen
-        self.show_splash()
+        self.current_tuning = StringVar(value="")
 
         # Configuration de la grille principale
         root.grid_rowconfigure(1, weight=1)
@@ -327,72 +1533,19 @@ class ModernXenderGUI:
         self.create_header()
         self.create_main_content()
         self.create_footer()
-
-        # Démarrer les threads réseau
-        threading.Thread(target=discover_peers, daemon=True).start()
-        threading.Thread(target=announce_presence, daemon=True).start()
+        self.startup.mark("widgets")
 
         # Démarrer la mise à jour de la queue
         self.root.after(200, self.process_queue)
+        self.root.after_idle(self.on_ready)
 
-        self.log(f"Application démarrée - IP locale: {my_ip()}", "success")
+        self.log("Application démarrée", "success")
         self.log("Recherche d'appareils en cours...", "info")
 
-    def show_splash(self):
-        """Splash screen moderne avec animation"""
-        splash = Toplevel()
-        splash.overrideredirect(True)
-
-        screen_width = splash.winfo_screenwidth()
-        screen_height = splash.winfo_screenheight()
-        splash_width = 500
-        splash_height = 300
-        x = (screen_width - splash_width) // 2
-        y = (screen_height - splash_height) // 2
-
-        splash.geometry(f"{splash_width}x{splash_height}+{x}+{y}")
-
-        # Gradient background
-        canvas = Canvas(splash, width=splash_width, height=splash_height, highlightthickness=0)
-        canvas.pack()
-
-        # Créer un gradient
-        for i in range(splash_height):
-            color_value = int(91 + (139 - 91) * (i / splash_height))
-            color = f'#{color_value:02x}7fff'
-            canvas.create_line(0, i, splash_width, i, fill=color)
-
-        # Titre
-        canvas.create_text(splash_width/2, 100, text="ShabbibySend",
-                          fill='#ffffff', font=('Segoe UI', 32, 'bold'))
-        canvas.create_text(splash_width/2, 145, text="Transfert de fichiers P2P moderne",
-                          fill='#e0e7ff', font=('Segoe UI', 12))
-
-        # Barre de progression
-        progress_width = 300
-        progress_x = (splash_width - progress_width) / 2
-        progress_y = 200
-
-        canvas.create_rectangle(progress_x, progress_y, progress_x + progress_width, progress_y + 6,
-                                fill='#ffffff', outline='')
-
-        progress_bar = canvas.create_rectangle(progress_x, progress_y, progress_x, progress_y + 6,
-                                              fill='#ffffff', outline='')
-
-        loading_text = canvas.create_text(splash_width/2, 230, text="Chargement...",
-                                         fill='#ffffff', font=('Segoe UI', 10))
-
-        # Animation de la barre de progression
-        def animate(progress=0):
-            if progress <= 100:
-                new_width = progress_x + (progress_width * progress / 100)
-                canvas.coords(progress_bar, progress_x, progress_y, new_width, progress_y + 6)
-                canvas.itemconfig(loading_text, text=f"Chargement... {progress}%")
-                splash.after(20, animate, progress + 2)
-            else:
-                splash.destroy()
-
-        animate()
+    def on_ready(self):
+        """Appelé au premier passage inactif de la boucle Tk : la fenêtre est utilisable"""
+        self.startup.mark("interactif")
+        self.log(self.startup.report(), "info")
 
     def create_header(self):
         """Créer l'en-tête moderne avec dégradé"""
@@ -417,7 +1570,7 @@ class ModernXenderGUI:
         Label(title_container, text="ShabbibySend", bg=self.theme['primary'],
               fg='#ffffff', font=('Segoe UI', 20, 'bold')).pack(anchor='w')
 
-        self.ip_var = StringVar(value=f"🌐 Votre IP : {my_ip()}")
+        self.ip_var = StringVar(value="🌐 Votre IP : recherche...")
         Label(title_container, textvariable=self.ip_var, bg=self.theme['primary'],
               fg='#e0e7ff', font=('Segoe UI', 10)).pack(anchor='w')
 
@@ -460,8 +1613,8 @@ class ModernXenderGUI:
         left.configure(highlightbackground=self.theme['border'], highlightthickness=1)
 
         left.grid_rowconfigure(1, weight=1)  # zone appareils → extensible
-        left.grid_rowconfigure(4, weight=1)  # stats_frame si tu veux qu'elle s'étire
-        left.grid_rowconfigure(6, weight=1)  # progress_container
+        left.grid_rowconfigure(5, weight=1)  # stats_frame si tu veux qu'elle s'étire
+        left.grid_rowconfigure(7, weight=1)  # progress_container
         left.grid_columnconfigure(0, weight=1)
 
         # Section Appareils
@@ -469,21 +1622,9 @@ class ModernXenderGUI:
               fg=self.theme['text_primary'], font=('Segoe UI', 12, 'bold')).grid(
             row=0, column=0, sticky="w", padx=15, pady=(15, 5))
 
-        # Listbox des pairs avec style
-        list_frame = Frame(left, bg=self.theme['card_bg'])
-        list_frame.grid(row=1, column=0, sticky="ew", padx=15, pady=5)
-
-        scrollbar = Scrollbar(list_frame)
-        scrollbar.pack(side='right', fill='y')
-
-        self.peers_listbox = Listbox(list_frame, yscrollcommand=scrollbar.set,
-                                     bg=self.theme['bg'], fg=self.theme['text_primary'],
-                                     selectbackground=self.theme['primary'],
-                                     selectforeground='#ffffff',
-                                     font=('Segoe UI', 10), bd=0, highlightthickness=0,
-                                     height=8)
-        self.peers_listbox.pack(side='left', fill='both', expand=True)
-        scrollbar.config(command=self.peers_listbox.yview)
+        # Liste virtualisée des pairs avec recherche
+        self.peer_view = PeerListView(left, self.theme, rows=8)
+        self.peer_view.grid(row=1, column=0, sticky="ew", padx=15, pady=5)
 
         # Boutons d'action
         btn_frame = Frame(left, bg=self.theme['card_bg'])
@@ -497,23 +1638,38 @@ class ModernXenderGUI:
                fg='#ffffff', font=('Segoe UI', 10, 'bold'), bd=0, cursor='hand2',
                command=self.on_receive, padx=15, pady=10).pack(side="left", padx=5, pady=3)
 
+        Button(btn_frame, text="🔁 Synchroniser dossier", bg=self.theme['secondary'],
+               fg='#ffffff', font=('Segoe UI', 10, 'bold'), bd=0, cursor='hand2',
+               command=self.on_mirror, padx=15, pady=10).pack(side="left", padx=5, pady=3)
+
+        share_frame = Frame(left, bg=self.theme['card_bg'])
+        share_frame.grid(row=3, column=0, sticky="ew", padx=15, pady=(0, 10))
+
+        Button(share_frame, text="📦 Partager fichier(s)", bg=self.theme['accent'],
+               fg='#ffffff', font=('Segoe UI', 10, 'bold'), bd=0, cursor='hand2',
+               command=self.on_share, padx=15, pady=10).pack(side="left", padx=5, pady=3)
+
+        Button(share_frame, text="⬇️ Télécharger (multi-sources)", bg=self.theme['primary'],
+               fg='#ffffff', font=('Segoe UI', 10, 'bold'), bd=0, cursor='hand2',
+               command=self.on_swarm_download, padx=15, pady=10).pack(side="left", padx=5, pady=3)
+
         # Section Statistiques
         Label(left, text="📊 Statistiques de session", bg=self.theme['card_bg'],
               fg=self.theme['text_primary'], font=('Segoe UI', 12, 'bold')).grid(
-            row=3, column=0, sticky="w", padx=15, pady=(15, 5))
+            row=4, column=0, sticky="w", padx=15, pady=(15, 5))
 
         self.stats_frame = Frame(left, bg=self.theme['card_bg'])
-        self.stats_frame.grid(row=4, column=0, sticky="ew", padx=15, pady=5)
+        self.stats_frame.grid(row=5, column=0, sticky="ew", padx=15, pady=5)
 
         self.create_stats_display()
 
         # Section Transfert en cours
         Label(left, text="⚡ Transfert en cours", bg=self.theme['card_bg'],
               fg=self.theme['text_primary'], font=('Segoe UI', 12, 'bold')).grid(
-            row=5, column=0, sticky="w", padx=15, pady=(15, 5))
+            row=6, column=0, sticky="w", padx=15, pady=(15, 5))
 
         progress_container = Frame(left, bg=self.theme['card_bg'])
-        progress_container.grid(row=6, column=0, sticky="ew", padx=15, pady=5)
+        progress_container.grid(row=7, column=0, sticky="ew", padx=15, pady=5)
 
         self.progress = ttk.Progressbar(progress_container, orient='horizontal',
                                        mode='determinate', length=300)
@@ -527,6 +1683,9 @@ class ModernXenderGUI:
         Label(info_frame, textvariable=self.current_speed, bg=self.theme['card_bg'],
               fg=self.theme['text_secondary'], font=('Segoe UI', 9)).pack(side='right')
 
+        Label(progress_container, textvariable=self.current_tuning, bg=self.theme['card_bg'],
+              fg=self.theme['text_secondary'], font=('Segoe UI', 8)).pack(anchor='w')
+
     def create_stats_display(self):
         """Afficher les statistiques"""
         for widget in self.stats_frame.winfo_children():
@@ -618,6 +1777,7 @@ class ModernXenderGUI:
         # Tags pour l'historique
         self.history_text.tag_config('sent', foreground=self.theme['primary'])
         self.history_text.tag_config('received', foreground=self.theme['success'])
+        self.history_text.tag_config('tuning', foreground=self.theme['text_secondary'])
 
     def create_footer(self):
         """Créer le pied de page"""
@@ -676,14 +1836,29 @@ class ModernXenderGUI:
             self.history_text.insert(END, f"{entry['filename']} ", tag)
             self.history_text.insert(END, f"({format_size(entry['size'])}) ")
             self.history_text.insert(END, f"{'→' if entry['type'] == 'sent' else '←'} {entry['peer']}\n")
+            if entry.get('tuning'):
+                self.history_text.insert(END, f"    ⚙️ {describe_tuning(entry['tuning'])}\n", 'tuning')
 
         self.history_text.config(state='disabled')
 
     def update_peers_list(self):
-        """Mettre à jour la liste des pairs"""
-        self.peers_listbox.delete(0, END)
-        for ip in sorted(PEERS):
-            self.peers_listbox.insert(END, f"  🖥️  {ip}")
+        """Resynchroniser la liste des pairs avec PEERS"""
+        for ip in list(PEERS):
+            if ip not in self.peer_view.index.records:
+                self.peer_view.add_peer({'ip': ip})
+        for ip in list(self.peer_view.index.records):
+            if ip not in PEERS:
+                self.peer_view.remove_peer(ip)
+        self.peer_view.schedule_render()
+
+    def get_selected_ip(self):
+        """Retourne l'IP du pair sélectionné, ou avertit l'utilisateur"""
+        peer = self.peer_view.selected_peer()
+        if peer is None:
+            messagebox.showwarning("⚠️ Aucun destinataire",
+                                  "Veuillez sélectionner un appareil dans la liste.")
+            return None
+        return peer['ip']
 
     def notify(self, message):
         """Afficher une notification"""
@@ -691,15 +1866,10 @@ class ModernXenderGUI:
 
     def on_send_file(self):
         """Envoyer un ou plusieurs fichiers"""
-        selected = self.peers_listbox.curselection()
-        if not selected:
-            messagebox.showwarning("⚠️ Aucun destinataire",
-                                  "Veuillez sélectionner un appareil dans la liste.")
+        ip = self.get_selected_ip()
+        if ip is None:
             return
 
-        ip_text = self.peers_listbox.get(selected[0])
-        ip = ip_text.split("🖥️")[1].strip()
-
         # Permettre la sélection multiple
         filepaths = filedialog.askopenfilenames(title="Choisir un ou plusieurs fichiers")
         if not filepaths:
@@ -712,6 +1882,66 @@ class ModernXenderGUI:
         else:
             send_multiple_files(ip, filepaths)
 
+    def on_mirror(self):
+        """Synchroniser un dossier (mode miroir) vers l'appareil sélectionné"""
+        ip = self.get_selected_ip()
+        if ip is None:
+            return
+
+        dirpath = filedialog.askdirectory(title="Choisir le dossier à synchroniser")
+        if not dirpath:
+            return
+
+        delete = messagebox.askyesno("🔁 Mode miroir",
+                                     "Supprimer aussi chez le destinataire les fichiers absents de ce dossier ?")
+
+        self.log(f"Synchronisation de {dirpath} vers {ip}", "info")
+        mirror_directory_to(ip, dirpath, delete=delete)
+
+    def on_share(self):
+        """Ajouter un ou plusieurs fichiers au catalogue partagé"""
+        filepaths = filedialog.askopenfilenames(title="Choisir les fichiers à partager")
+        for filepath in filepaths:
+            share_file(filepath)
+        if filepaths:
+            self.log(f"Calcul des empreintes de {len(filepaths)} fichier(s) à partager...", "info")
+
+    def on_swarm_download(self):
+        """Choisir un fichier du catalogue des pairs et le télécharger depuis toutes ses sources"""
+        files = swarm_sources()
+        if not files:
+            messagebox.showinfo("⬇️ Téléchargement multi-sources",
+                                "Aucun fichier partagé n'a encore été annoncé par les appareils.")
+            return
+
+        entries = sorted(files.items(), key=lambda item: (-len(item[1][2]), item[1][0]))
+
+        dialog = Toplevel(self.root)
+        dialog.title("⬇️ Fichiers partagés")
+        dialog.configure(bg=self.theme['card_bg'])
+        dialog.transient(self.root)
+
+        listbox = Listbox(dialog, bg=self.theme['bg'], fg=self.theme['text_primary'],
+                          selectbackground=self.theme['primary'], selectforeground='#ffffff',
+                          font=('Segoe UI', 10), bd=0, highlightthickness=0, width=60, height=12)
+        listbox.pack(fill='both', expand=True, padx=15, pady=(15, 5))
+        for _, (name, size, sources) in entries:
+            listbox.insert(END, f"  {name}  ({format_size(size)}) — {len(sources)} source(s)")
+
+        def download():
+            selected = listbox.curselection()
+            if not selected:
+                return
+            file_hash, (name, size, sources) = entries[selected[0]]
+            dialog.destroy()
+            self.log(f"Téléchargement de {name} depuis {len(sources)} source(s)", "info")
+            swarm_download(file_hash, name, size, sources)
+
+        listbox.bind('<Double-Button-1>', lambda e: download())
+        Button(dialog, text="⬇️ Télécharger", bg=self.theme['primary'],
+               fg='#ffffff', font=('Segoe UI', 10, 'bold'), bd=0, cursor='hand2',
+               command=download, padx=15, pady=8).pack(pady=(5, 15))
+
     def on_receive(self):
         """Activer le mode réception"""
         start_receiver(nonblocking=True)
@@ -740,8 +1970,18 @@ class ModernXenderGUI:
                     _, message, level = item
                     self.log(message, level)
 
+                elif typ == "local_ip":
+                    _, ip = item
+                    self.ip_var.set(f"🌐 Votre IP : {ip}")
+                    self.log(f"IP locale: {ip}", "success")
+
                 elif typ == "peer_add":
-                    self.update_peers_list()
+                    _, ip = item
+                    self.peer_view.add_peer({'ip': ip})
+
+                elif typ == "peer_remove":
+                    _, ip = item
+                    self.peer_view.remove_peer(ip)
 
                 elif typ == "notify":
                     _, message = item
@@ -754,6 +1994,11 @@ class ModernXenderGUI:
                     self.current_speed.set("0 B/s")
                     self.log(f"Envoi démarré: {filename} ({format_size(filesize)})", "info")
 
+                elif typ == "tuning":
+                    _, tuning = item
+                    self.current_tuning.set(f"⚙️ {describe_tuning(tuning)}")
+                    self.log(f"Réglage du transfert: {describe_tuning(tuning)}", "info")
+
                 elif typ == "progress_send":
                     _, (sent, total, filename, speed) = item
                     progress = int((sent / total) * 100)
@@ -791,6 +2036,29 @@ class ModernXenderGUI:
 
 # ---------- Point d'entrée ----------
 if __name__ == "__main__":
-    root = Tk()
-    app = ModernXenderGUI(root)
+    startup_check_mode = '--startup-check' in sys.argv
+    profiler = StartupProfiler(_STARTUP_T0)
+    try:
+        root = Tk()
+    except tk.TclError as e:
+        # Sans affichage (ex. CI), lancer sous xvfb-run
+        print(f"Affichage indisponible: {e}", file=sys.stderr)
+        sys.exit(2)
+    profiler.mark("Tk")
+    # La vérification du démarrage ne mesure que l'interface : pas de découverte ni de partage
+    app = ModernXenderGUI(root, profiler, network=not startup_check_mode)
+
+    if startup_check_mode:
+        # Vérifie le temps jusqu'à l'interactivité puis quitte (code 1 si budget dépassé)
+        result = {}
+
+        def startup_check():
+            result['ms'] = profiler.total_ms()
+            print(profiler.report())
+            root.destroy()
+
+        root.after_idle(startup_check)
+        root.mainloop()
+        sys.exit(0 if result.get('ms', float('inf')) <= STARTUP_BUDGET_MS else 1)
+
     root.mainloop()
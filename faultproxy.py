@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+ShabbibySend - Proxy local d'injection de pannes réseau
+Banc d'essai pour mesurer send_file_to / start_receiver et la découverte des pairs
+sous mauvaises conditions (latence, gigue, pertes, débit limité, blocages, coupures)
+sur une seule machine.
+
+Utilisation :
+    python faultproxy.py                          # tous les scénarios intégrés
+    python faultproxy.py --scenario wifi --size 50
+    python faultproxy.py --scenario-file scenarios.json --json resultats.json
+"""
+
+import argparse
+import json
+import os
+import queue
+import random
+import socket
+import struct
+import sys
+import tempfile
+import threading
+import time
+
+import ShabbibySend as app
+
+# ---------- Configuration ----------
+PIPE_CHUNK = 32 * 1024       # Taille des lectures côté proxy
+PIPE_QUEUE_CHUNKS = 8        # Blocs en vol par sens (conserve la contre-pression TCP)
+PIPE_SOCKET_BUFFER = 64 * 1024  # Tampons noyau du proxy : les ACK suivent le débit simulé
+DEFAULT_RTO_MS = 200         # Pénalité de retransmission simulée pour une « perte »
+DEFAULT_TIMEOUT = 120
+
+# Paramètres reconnus dans un profil :
+#   latency_ms, jitter_ms  : délai ajouté à chaque bloc (gigue gaussienne)
+#   loss, rto_ms           : probabilité qu'un bloc subisse une retransmission (TCP)
+#                            ou soit perdu (UDP)
+#   rate_mbps              : débit maximal par sens
+#   stall_after_mb, stall_s: blocage du flux après N Mo
+#   reset_after_mb         : coupure (RST) du flux après N Mo
+#   fault_direction        : sens soumis aux blocages/coupures : 'up' (client -> cible,
+#                            par défaut), 'down' (cible -> client, ex. segments tirés) ou 'both'
+#   discovery              : mesure la découverte UDP (annonces via UdpFaultProxy)
+#                            au lieu d'un transfert de fichier
+SCENARIOS = {
+    'ideal': {},
+    'wifi': {'latency_ms': 15, 'jitter_ms': 10, 'rate_mbps': 40, 'loss': 0.005},
+    'wifi_degrade': {'latency_ms': 60, 'jitter_ms': 40, 'rate_mbps': 8, 'loss': 0.02},
+    'debit_10mbps': {'rate_mbps': 10},
+    'blocage': {'latency_ms': 5, 'stall_after_mb': 4, 'stall_s': 3},
+    'coupure': {'reset_after_mb': 6},
+    'decouverte_pertes': {'discovery': True, 'latency_ms': 30, 'jitter_ms': 20, 'loss': 0.5},
+}
+
+def _delay(profile):
+    """Délai (s) à appliquer à un bloc selon le profil"""
+    delay = profile.get('latency_ms', 0) / 1000
+    if profile.get('jitter_ms'):
+        delay += random.gauss(0, profile['jitter_ms'] / 1000)
+    return max(delay, 0)
+
+def _abort(sock):
+    """Ferme une socket en envoyant un RST plutôt qu'un FIN"""
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+        # Réveille un recv() bloqué dans l'autre sens sans émettre de FIN
+        sock.shutdown(socket.SHUT_RD)
+    except OSError:
+        pass
+    try:
+        sock.close()
+    except OSError:
+        pass
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+# ---------- Proxy TCP ----------
+class _Pipe:
+    """Un sens de circulation : lecture, planification puis écriture retardée"""
+
+    def __init__(self, src, dst, profile, faults, on_reset):
+        self.src = src
+        self.dst = dst
+        self.profile = profile
+        self.faults = faults  # Blocages et coupures appliqués à ce sens
+        self.on_reset = on_reset
+        self.queue = queue.Queue(maxsize=PIPE_QUEUE_CHUNKS)
+        self.rate = profile.get('rate_mbps', 0) * 1_000_000 / 8
+        self.last_deliver = 0.0
+        self.next_free = 0.0
+        self.forwarded = 0
+        self.stalled = False
+
+    def start(self):
+        threading.Thread(target=self._read, daemon=True).start()
+        threading.Thread(target=self._write, daemon=True).start()
+
+    def _read(self):
+        loss = self.profile.get('loss', 0)
+        rto = self.profile.get('rto_ms', DEFAULT_RTO_MS) / 1000
+        try:
+            while True:
+                data = self.src.recv(PIPE_CHUNK)
+                if not data:
+                    break
+                delay = _delay(self.profile)
+                if loss and random.random() < loss:
+                    delay += rto
+                # Conserver l'ordre du flux malgré la gigue
+                self.last_deliver = max(time.monotonic() + delay, self.last_deliver)
+                self.queue.put((self.last_deliver, data))
+        except OSError:
+            pass
+        self.queue.put(None)
+
+    def _write(self):
+        stall_after = self.profile.get('stall_after_mb', 0) * 1024 * 1024 if self.faults else 0
+        reset_after = self.profile.get('reset_after_mb', 0) * 1024 * 1024 if self.faults else 0
+        try:
+            while True:
+                item = self.queue.get()
+                if item is None:
+                    self.dst.shutdown(socket.SHUT_WR)
+                    return
+                deliver_at, data = item
+                send_at = max(deliver_at, self.next_free)
+                if self.rate:
+                    self.next_free = send_at + len(data) / self.rate
+                wait = send_at - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+
+                reached = self.forwarded + len(data)
+                if stall_after and not self.stalled and reached >= stall_after:
+                    self.stalled = True
+                    time.sleep(self.profile.get('stall_s', 0))
+                if reset_after and reached >= reset_after:
+                    self.on_reset()
+                    return
+
+                self.dst.sendall(data)
+                self.forwarded = reached
+        except OSError:
+            self.on_reset()
+
+class TcpFaultProxy:
+    """Proxy TCP local injectant latence, pertes, limite de débit, blocages et coupures"""
+
+    def __init__(self, listen_port, target, profile=None):
+        self.listen_port = listen_port
+        self.target = target
+        self.profile = profile or {}
+        self.server = None
+        self.connections = []
+
+    def start(self):
+        self.server = socket.socket()
+        self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        # Le proxy acquitte lui-même les données : de grands tampons masqueraient
+        # le lien simulé à l'émetteur (fixé avant listen() pour être hérité)
+        self.server.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, PIPE_SOCKET_BUFFER)
+        self.server.bind(('127.0.0.1', self.listen_port))
+        self.server.listen(8)
+        threading.Thread(target=self._accept, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self.server is not None:
+            self.server.close()
+        for client, upstream in self.connections:
+            _abort(client)
+            _abort(upstream)
+
+    def _accept(self):
+        while True:
+            try:
+                client, _ = self.server.accept()
+            except OSError:
+                return
+            try:
+                upstream = socket.socket()
+                upstream.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, PIPE_SOCKET_BUFFER)
+                upstream.connect(self.target)
+            except OSError:
+                _abort(client)
+                continue
+            self.connections.append((client, upstream))
+
+            def reset(client=client, upstream=upstream):
+                _abort(client)
+                _abort(upstream)
+
+            direction = self.profile.get('fault_direction', 'up')
+            _Pipe(client, upstream, self.profile, direction in ('up', 'both'), reset).start()
+            _Pipe(upstream, client, self.profile, direction in ('down', 'both'), reset).start()
+
+# ---------- Proxy UDP ----------
+class UdpFaultProxy:
+    """Proxy UDP local injectant latence, gigue et pertes de datagrammes"""
+
+    def __init__(self, listen_port, target, profile=None):
+        self.listen_port = listen_port
+        self.target = target
+        self.profile = profile or {}
+        self.sock = None
+        self.upstream = None
+        self.client = None
+
+    def start(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(('127.0.0.1', self.listen_port))
+        self.upstream = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        threading.Thread(target=self._forward, args=(self.sock, self.upstream, True), daemon=True).start()
+        threading.Thread(target=self._forward, args=(self.upstream, self.sock, False), daemon=True).start()
+        return self
+
+    def stop(self):
+        for s in (self.sock, self.upstream):
+            if s is not None:
+                s.close()
+
+    def _forward(self, src, dst, outbound):
+        loss = self.profile.get('loss', 0)
+        while True:
+            try:
+                data, addr = src.recvfrom(65535)
+            except OSError:
+                return
+            if outbound:
+                self.client = addr
+                target = self.target
+            elif self.client is None:
+                continue
+            else:
+                target = self.client
+            if loss and random.random() < loss:
+                continue
+            threading.Timer(_delay(self.profile), self._send, args=(dst, data, target)).start()
+
+    @staticmethod
+    def _send(sock, data, target):
+        try:
+            sock.sendto(data, target)
+        except OSError:
+            pass
+
+# ---------- Scénarios ----------
+def run_discovery_scenario(name, profile, timeout=DEFAULT_TIMEOUT):
+    """Diffuse des annonces de présence à travers le proxy UDP et mesure le délai de découverte"""
+    while not app.gui_queue.empty():
+        app.gui_queue.get_nowait()
+    app.PEERS.clear()
+    app.PEER_LAST_SEEN.clear()
+    # Les annonces reviennent de la boucle locale : ne pas les écarter comme notre propre écho
+    local_ip = app._local_ip
+    app._local_ip = '0.0.0.0'
+
+    discovery_port = free_port()
+    proxy_port = free_port()
+    threading.Thread(target=app.discover_peers, args=(discovery_port,), daemon=True).start()
+    time.sleep(0.2)
+    proxy = UdpFaultProxy(proxy_port, ('127.0.0.1', discovery_port), profile).start()
+
+    start = time.perf_counter()
+    threading.Thread(target=app.announce_presence, args=(('127.0.0.1', proxy_port),), daemon=True).start()
+    discovered = False
+    errors = []
+    deadline = start + timeout
+    while not discovered and time.perf_counter() < deadline:
+        try:
+            item = app.gui_queue.get(timeout=0.5)
+        except queue.Empty:
+            continue
+        if item[0] == 'peer_add':
+            discovered = True
+        elif item[0] == 'log' and item[2] == 'error':
+            errors.append(item[1])
+            break
+    elapsed = time.perf_counter() - start
+    proxy.stop()
+    app._local_ip = local_ip
+
+    return {
+        'scenario': name,
+        'profile': profile,
+        'size': 0,
+        'received': 0,
+        'complete': discovered,
+        'timed_out': not discovered and not errors,
+        'seconds': round(elapsed, 3),
+        'throughput': None,
+        'errors': errors,
+    }
+
+def run_scenario(name, profile, source, workdir, timeout=DEFAULT_TIMEOUT):
+    """Envoie `source` à travers le proxy et mesure le temps de réalisation et le débit"""
+    recv_dir = os.path.join(workdir, name)
+    os.makedirs(recv_dir, exist_ok=True)
+    # Réglages mémorisés et fichiers reçus isolés par scénario
+    app.CONFIG_DIR = os.path.join(recv_dir, 'config')
+    app._tuning_profiles = None
+    os.chdir(recv_dir)
+
+    while not app.gui_queue.empty():
+        app.gui_queue.get_nowait()
+
+    receiver_port = free_port()
+    proxy_port = free_port()
+    app.start_receiver(nonblocking=True, port=receiver_port)
+    time.sleep(0.2)
+    proxy = TcpFaultProxy(proxy_port, ('127.0.0.1', receiver_port), profile).start()
+
+    filesize = os.path.getsize(source)
+    start = time.perf_counter()
+    app.send_file_to('127.0.0.1', source, port=proxy_port)
+
+    # Attendre le message final de l'expéditeur et du récepteur
+    finished = 0
+    errors = []
+    deadline = start + timeout
+    while finished < 2 and time.perf_counter() < deadline:
+        try:
+            item = app.gui_queue.get(timeout=0.5)
+        except queue.Empty:
+            continue
+        if item[0] == 'log' and item[2] in ('success', 'error'):
+            finished += 1
+            if item[2] == 'error':
+                errors.append(item[1])
+    elapsed = time.perf_counter() - start
+    proxy.stop()
+
+    received_path = os.path.join(recv_dir, f"RECU_{os.path.basename(source)}")
+    received = os.path.getsize(received_path) if os.path.exists(received_path) else 0
+    complete = received == filesize and app.hash_file(received_path) == app.hash_file(source)
+    return {
+        'scenario': name,
+        'profile': profile,
+        'size': filesize,
+        'received': received,
+        'complete': complete,
+        'timed_out': finished < 2,
+        'seconds': round(elapsed, 3),
+        # Un transfert incomplet n'a pas de débit significatif
+        'throughput': received / elapsed if complete and elapsed > 0 else None,
+        'errors': errors,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Banc d'essai ShabbibySend sous pannes réseau simulées")
+    parser.add_argument('--scenario', action='append', help="Scénario à exécuter (répétable)")
+    parser.add_argument('--scenario-file', help="Fichier JSON {nom: profil} de scénarios supplémentaires")
+    parser.add_argument('--size', type=float, default=20, help="Taille du fichier de test en Mo")
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help="Délai maximal par scénario (s)")
+    parser.add_argument('--json', help="Écrire les résultats dans ce fichier JSON")
+    args = parser.parse_args(argv)
+
+    scenarios = dict(SCENARIOS)
+    if args.scenario_file:
+        with open(args.scenario_file, 'r', encoding='utf-8') as f:
+            scenarios.update(json.load(f))
+    names = args.scenario or list(scenarios)
+    unknown = [n for n in names if n not in scenarios]
+    if unknown:
+        parser.error(f"Scénario(s) inconnu(s): {', '.join(unknown)}")
+
+    json_path = os.path.abspath(args.json) if args.json else None
+    workdir = tempfile.mkdtemp(prefix='shabbiby-faultproxy-')
+    source = os.path.join(workdir, 'source.bin')
+    with open(source, 'wb') as f:
+        f.write(os.urandom(int(args.size * 1024 * 1024)))
+
+    results = []
+    print(f"{'Scénario':<20}{'Statut':<10}{'Durée':>10}{'Débit':>16}")
+    for name in names:
+        if scenarios[name].get('discovery'):
+            result = run_discovery_scenario(name, scenarios[name], args.timeout)
+        else:
+            result = run_scenario(name, scenarios[name], source, workdir, args.timeout)
+        results.append(result)
+        status = 'OK' if result['complete'] else ('DÉLAI' if result['timed_out'] else 'ÉCHEC')
+        speed = app.format_speed(result['throughput']) if result['throughput'] is not None else '-'
+        print(f"{name:<20}{status:<10}{result['seconds']:>9.2f}s{speed:>16}")
+
+    if json_path:
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
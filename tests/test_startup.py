@@ -0,0 +1,57 @@
+"""Temps jusqu'à l'interactivité de la fenêtre principale, réseau compris"""
+
+import os
+import socket
+import sys
+import threading
+
+import pytest
+
+tk = pytest.importorskip('tkinter')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import ShabbibySend as app  # noqa: E402
+
+
+def free_port(kind=socket.SOCK_STREAM):
+    with socket.socket(socket.AF_INET, kind) as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def root():
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        pytest.skip("aucun affichage disponible (lancer sous xvfb-run)")
+    yield root
+    root.destroy()
+
+
+def test_interactive_within_budget_without_default_route(root, monkeypatch, tmp_path):
+    # Sans route par défaut, la résolution de l'IP locale reste bloquée
+    release = threading.Event()
+
+    def blocked_ip(refresh=False):
+        release.wait(30)
+        return '127.0.0.1'
+
+    monkeypatch.setattr(app, 'my_ip', blocked_ip)
+    monkeypatch.setattr(app, 'DISCOVERY_PORT', free_port(socket.SOCK_DGRAM))
+    monkeypatch.setattr(app, 'SHARE_PORT', free_port())
+    monkeypatch.setattr(app, 'CONFIG_DIR', str(tmp_path))
+
+    profiler = app.StartupProfiler()
+    try:
+        app.ModernXenderGUI(root, profiler)
+        # Planifié après on_ready : quitte la boucle dès la fenêtre interactive
+        root.after_idle(root.quit)
+        root.mainloop()
+    finally:
+        release.set()
+
+    labels = [label for label, _ in profiler.marks]
+    assert 'réseau' in labels
+    assert labels[-1] == 'interactif'
+    assert profiler.total_ms() <= app.STARTUP_BUDGET_MS, profiler.report()